@@ -8,6 +8,7 @@ Created on Sat Nov 19 15:20:37 2024
 
 import math
 import random
+import numpy as np
 from obspy.taup import TauPyModel
 from obspy.geodetics import locations2degrees
 
@@ -20,12 +21,14 @@ R_Earth = 6371e3
 Vp = 8000               # vitesse onde P en m/s
 Vs = Vp / math.sqrt(3)  # vitesse onde S en m/s
 
+# Random draws come from generator if given (e.g. np.random.Generator), else from the random module
 # Source coordinates
-def generate_coordinates(depth=None):
-    latitude = random.uniform(-90, 90)
-    longitude = random.uniform(-180, 180)
+def generate_coordinates(depth=None, generator=None):
+    generator = random if generator is None else generator
+    latitude = generator.uniform(-90, 90)
+    longitude = generator.uniform(-180, 180)
     if depth is None:
-        depth = random.uniform(0, 100e3)
+        depth = generator.uniform(0, 100e3)
     return latitude, longitude, depth
 
 # Angular distance (surface)
@@ -58,12 +61,28 @@ def direct_distance(lat1, lon1, dep1, lat2, lon2, dep2):
     x2, y2, z2 = to_cartesian(lat2, lon2, dep2)
     return math.sqrt((x2 - x1)**2 + (y2 - y1)**2 + (z2 - z1)**2)
 
+# Direct distances (vectorized, arguments can be arrays of coordinates)
+def to_cartesian_array(lat, lon, depth):
+    lat_rad = np.radians(lat)
+    lon_rad = np.radians(lon)
+    r = R_Earth - np.asarray(depth)
+    x = r * np.cos(lat_rad) * np.cos(lon_rad)
+    y = r * np.cos(lat_rad) * np.sin(lon_rad)
+    z = r * np.sin(lat_rad)
+    return np.stack(np.broadcast_arrays(x, y, z), axis=-1)
+
+def direct_distances(lat1, lon1, dep1, lat2, lon2, dep2):
+    points1 = to_cartesian_array(lat1, lon1, dep1)
+    points2 = to_cartesian_array(lat2, lon2, dep2)
+    return np.linalg.norm(points2 - points1, axis=-1)
+
 # Generate valid station (30-90°)
-def generate_station(lat_epi, lon_epi):
+def generate_station(lat_epi, lon_epi, generator=None):
+    generator = random if generator is None else generator
     while True:
         # Génère une station aléatoire
-        lat_station = random.uniform(-90, 90)
-        lon_station = random.uniform(-180, 180)
+        lat_station = generator.uniform(-90, 90)
+        lon_station = generator.uniform(-180, 180)
         delta = haversine(lat_epi, lon_epi, lat_station, lon_station)
         delta_degrees = math.degrees(delta)
 
@@ -93,14 +112,14 @@ def travel_times(lat1, lon1, dep1, lat2, lon2):
     return tP, tpP, tsP
 
 # Generate samples
-def generate_arrival_samples(num_stations=50, depth=None, use_TauP=False):
-    source = generate_coordinates(depth=depth)
+def generate_arrival_samples(num_stations=50, depth=None, use_TauP=False, generator=None):
+    source = generate_coordinates(depth=depth, generator=generator)
     deltas = []
     stations = []
     
     for _ in range(num_stations):
         # Generate station
-        station = generate_station(source[0], source[1])
+        station = generate_station(source[0], source[1], generator=generator)
         
         if use_TauP:
             distance_deg = locations2degrees(lat1=source[0],
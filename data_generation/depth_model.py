@@ -6,7 +6,6 @@ Created on Fri Nov 29 18:08:04 2024
 @author: Basile Dupont
 """
 
-import matplotlib.pyplot as plt
 import numpy as np
 from tqdm.notebook import tqdm
 import torch
@@ -289,6 +288,7 @@ def train_DepthModel(model_name, batch_size=64, num_stations=50, rand_inactive=0
 
     # Plot if True
     if plot:
+        import matplotlib.pyplot as plt  # Deferred import, only needed for plotting
         epochs = range(1, len(train_losses) + 1)
         plt.figure(figsize=(15,3))
         plt.plot(epochs, train_losses, label="Train Loss")
@@ -379,6 +379,7 @@ def test_DepthModel(model_name, device_name="cuda", num_test=1000, num_stations=
     
     # Plot if True
     if plot:
+        import matplotlib.pyplot as plt  # Deferred import, only needed for plotting
         plt.figure(figsize=(15,3))
         plt.scatter(real_depths/1e3, delta_depths/1e3, marker='.')
         plt.xlabel("Depth (km)")
@@ -433,6 +434,7 @@ def run_random_DepthModel(model_name, device_name="cuda", num_stations=50, rand_
             predicted_depth = model(X)
 
     if plot:
+        import matplotlib.pyplot as plt  # Deferred import, only needed for plotting
         # Plot envelopes
         image = X_cpu.squeeze(0).squeeze(0)  # Turn signals into 2D for mapping
         
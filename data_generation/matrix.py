@@ -8,15 +8,15 @@ Created on Sat Nov 19 23:57:18 2024
 
 
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import torch
+import numbers
+from concurrent.futures import ProcessPoolExecutor
 import data_generation.signal
 
 
 
 # Generate one matrix
-def generate_matrix(num_stations=50, depth=None, rand_inactive=0, use_TauP=True, plot=False):
+def generate_matrix(num_stations=50, depth=None, rand_inactive=0, use_TauP=True, plot=False, workers=-1, generator=None):
     """
     Generates a matrix and depth associated.
     
@@ -25,19 +25,21 @@ def generate_matrix(num_stations=50, depth=None, rand_inactive=0, use_TauP=True,
     - depth : depth to simulate (default is None)
     - rand_inactive : max number of inactive stations
     - use_TauP : whether to use or not TauP model for propagation
+    - workers : number of threads for the FFTs (default is -1, all cores)
+    - generator : np.random.Generator for all random draws (default is None, global generators)
     
     Returns:
     - signal_matrix : matrix with one line per signal
     - depth : the depth corresponding to this matrix
     """
-    results, distances = data_generation.signal.generate_signals(num_stations=num_stations, depth=depth, rand_inactive=rand_inactive, use_TauP=use_TauP)
+    results, distances = data_generation.signal.generate_signals(num_stations=num_stations, depth=depth, rand_inactive=rand_inactive, use_TauP=use_TauP, workers=workers, generator=generator)
 
     # Get depth (same for all)
     depth = results[0][1][2] # from 1st sample
 
     # Initialize matrix
     num_samples = len(results[0][0])
-    signal_matrix = np.zeros((num_stations, num_samples))
+    signal_matrix = np.zeros((num_stations, num_samples), dtype=np.float32)
     
     # Build matrix
     for i, (envelope, _, _) in enumerate(results):
@@ -45,6 +47,8 @@ def generate_matrix(num_stations=50, depth=None, rand_inactive=0, use_TauP=True,
 
     # Plot if True
     if plot:
+        import matplotlib.pyplot as plt  # Deferred import, only needed for plotting
+        import seaborn as sns  # Deferred import, only needed for plotting
         # Set Seaborn style
         sns.set_style("whitegrid")
         
@@ -83,6 +87,24 @@ def generate_matrix(num_stations=50, depth=None, rand_inactive=0, use_TauP=True,
 
 
 
+# Generate one matrix in a worker process
+def generate_matrix_worker(seed_sequence, matrix_kwargs):
+    """
+    Generates a matrix drawing from its own generator, seeded by seed_sequence.
+    Worker processes would otherwise inherit (or share) the same random state and produce identical matrices.
+    FFTs are single-threaded, parallelism already comes from the worker processes.
+    
+    Parameters:
+    - seed_sequence : np.random.SeedSequence specific to this matrix
+    - matrix_kwargs : keyword arguments passed to generate_matrix
+    
+    Returns:
+    - the outputs of generate_matrix
+    """
+    return generate_matrix(**matrix_kwargs, workers=1, generator=np.random.default_rng(seed_sequence))
+
+
+
 # Normalize distances
 def normalize_distances(distances, min_distance, max_distance):
     """
@@ -108,7 +130,7 @@ def normalize_distances(distances, min_distance, max_distance):
 
 
 # Generate multiple matrix for model training
-def dataset_generation(num_entries=32, num_stations=50, depth_list=None, rand_inactive=0, use_TauP=True):
+def dataset_generation(num_entries=32, num_stations=50, depth_list=None, rand_inactive=0, use_TauP=True, n_jobs=1, seed=None):
     """
     Generates a dataset containing signal matrices and their corresponding depths.
     
@@ -118,19 +140,40 @@ def dataset_generation(num_entries=32, num_stations=50, depth_list=None, rand_in
     - depth_list : list of depths to generate (should have num_entries size or None)
     - rand_inactive : max number of inactive stations
     - use_TauP : whether to use or not TauP model for propagation
+    - n_jobs : number of worker processes generating the matrices (1 runs sequentially, -1 uses all cores)
+    - seed : seed for reproducible datasets, giving the same entries whatever n_jobs (default is None, not reproducible)
+             Each entry draws from its own generator, global random states are left untouched.
     
     Returns:
     - X : numpy array of shape (num_entries, 1, num_stations, X) (signal matrices)
     - y : numpy array of shape (num_entries,) (depths)
     """
+    # Check the number of worker processes
+    if not isinstance(n_jobs, numbers.Integral) or isinstance(n_jobs, bool) or (n_jobs != -1 and n_jobs < 1):
+        raise ValueError(f"n_jobs must be -1 (all cores) or a positive number of processes, got {n_jobs!r}.")
+    
     data_matrix = []
     data_depth = [] 
     data_distances = []
     
-    for i in range(num_entries):
-        # Generate signal matrix and depth
-        signal_matrix, depth, distances = generate_matrix(num_stations=num_stations, depth=depth_list[i] if depth_list is not None else None, rand_inactive=rand_inactive, use_TauP=use_TauP)
-        
+    matrix_kwargs = [
+        dict(num_stations=num_stations, depth=depth_list[i] if depth_list is not None else None, rand_inactive=rand_inactive, use_TauP=use_TauP)
+        for i in range(num_entries)
+    ]
+    
+    # One seed per entry, so that entries do not depend on the process generating them
+    seed_sequences = np.random.SeedSequence(seed).spawn(num_entries)
+    
+    if n_jobs == 1 and seed is None:
+        generated = (generate_matrix(**kwargs) for kwargs in matrix_kwargs)
+    elif n_jobs == 1:
+        generated = (generate_matrix(**kwargs, generator=np.random.default_rng(seed_sequence)) for seed_sequence, kwargs in zip(seed_sequences, matrix_kwargs))
+    else:
+        # Entries are independent, so generate them in parallel
+        with ProcessPoolExecutor(max_workers=None if n_jobs == -1 else int(n_jobs)) as executor:
+            generated = list(executor.map(generate_matrix_worker, seed_sequences, matrix_kwargs))
+    
+    for signal_matrix, depth, distances in generated:
         # Save matrix, depth and distances
         data_matrix.append(signal_matrix)
         data_depth.append(depth)
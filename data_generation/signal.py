@@ -8,15 +8,61 @@ Created on Sat Nov 19 15:20:37 2024
 
 
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import random
 import math
-from scipy.signal import butter, filtfilt, hilbert, decimate
+import functools
+from scipy.signal import butter, sosfiltfilt, oaconvolve
+from scipy.fft import set_workers, next_fast_len, rfft, irfft
 import data_generation.arrival_time
 
+# Random generator shared by the whole signal generation
+rng = np.random.default_rng()
+
+# Time axis for the default duration (60 s) and sampling (100 Hz), shared by all stations
+default_time = np.arange(0, 60, 0.01)
+default_time.setflags(write=False)
+
+# Add an exponential tail as Diracs with controlled sign flips
+def add_coda_diracs(signal, start_index, amplitude, initial_sign, coda_duration, dt=0.01, tau=3.0, dt_factor=10, generator=None):
+    """
+    Adds, in place, a coda of Diracs with exponentially decreasing amplitude after a first arrival.
+    Works on a single signal with scalar parameters, or on a stack of signals with one parameter per signal.
+    
+    Parameters:
+    - signal: array containing the signal, or stack of signals of shape (stations, samples) (modified in place)
+    - start_index: index of the first arrival
+    - amplitude: amplitude of the first arrival
+    - initial_sign: sign of the first arrival
+    - coda_duration: maximum duration of the tail (in seconds)
+    - dt: sampling step (in seconds); 100 Hz
+    - tau: time constant for exponential decay (in seconds)
+    - dt_factor: spacing between two Diracs (in samples) ; 0.1s
+    - generator: np.random.Generator to draw from (default is the module generator rng)
+    """
+    generator = rng if generator is None else generator
+    signals = np.atleast_2d(signal)  # View on signal, so Diracs are written into it
+    start_index, amplitude, initial_sign = (np.reshape(x, (-1, 1)) for x in (start_index, amplitude, initial_sign))
+    num_diracs = np.reshape(np.asarray(coda_duration) / (dt_factor * dt), (-1, 1)).astype(int)
+    
+    # Dirac ranks in the coda, no further than the end of the signal
+    max_rank = min(num_diracs.max(), -(-(signals.shape[-1] - start_index.min()) // dt_factor))
+    i = np.arange(1, max_rank)
+    index = start_index + i * dt_factor
+    mask = (i < num_diracs) & (index < signals.shape[-1])  # Drop Diracs exceeding coda or signal duration
+
+    # 10% chance to flip the sign at each Dirac, flips accumulate along the coda
+    flips = generator.random(index.shape) < 0.1
+    signs = initial_sign * np.where(flips, -1, 1).cumprod(axis=-1)
+
+    # Exponential decay along the coda as a geometric progression: exp(-i * dt_factor * dt / tau) = ratio**i
+    decay = np.full(i.shape, math.exp(-dt_factor * dt / tau)).cumprod()
+
+    # Add the Diracs to the signals (indices are unique per signal)
+    rows = np.broadcast_to(np.arange(signals.shape[0])[:, np.newaxis], index.shape)
+    signals[rows[mask], index[mask]] += (signs * amplitude * decay)[mask]
+
+
 # Generate signal with discrete exponential tails and random radiation in the coda
-def generate_diracs(delta_pP, delta_sP, source, station, dt=0.01, duration=60, tau=3.0, plot=False):
+def generate_diracs(delta_pP, delta_sP, source, station, dt=0.01, duration=60, tau=3.0, plot=False, generator=None):
     """
     Generates a signal with Diracs for P, pP, and sP, each followed by an exponential tail 
     represented by a series of Diracs, with random sign flips in the coda.
@@ -27,62 +73,17 @@ def generate_diracs(delta_pP, delta_sP, source, station, dt=0.01, duration=60, t
     - dt: sampling step (in seconds); 100 Hz
     - duration: total signal duration (in seconds)
     - tau: time constant for exponential decay (in seconds)
-    - coda_duration: maximum duration of the tail (in seconds)
+    - generator: np.random.Generator to draw from (default is the module generator rng)
     
     Returns:
     - signal: array containing the signal
-    - time: array containing the corresponding time instances
+    - time: array containing the corresponding time instances (read-only, shared for the default duration and dt)
     """
-    # Compute coda duration from distance between station and epicenter
-    P_velocity = 7.5e3 # average P-waves velocity in the crust and upper mantle
-    dist_epi = data_generation.arrival_time.direct_distance(source[0], source[1], source[2], station[0], station[1], 0)
-    coda_duration = int(dist_epi / P_velocity)
-    
-    # Discrete time
-    time = np.arange(0, duration, dt)
-    signal = np.zeros_like(time)
-    
-    # Function to add an exponential tail as Diracs with controlled sign flips
-    def add_coda_diracs(signal, start_index, amplitude, initial_sign):
-        dt_factor = 10  # Controls spacing between two diracs ; 0.1s
-        sign = initial_sign  # Start with the initial sign
-        for i in range(1, int(coda_duration / (dt_factor * dt))):  # Adjust iteration
-            index = start_index + i * dt_factor
-            if index >= len(signal):  # If exceeding signal duration
-                break
-                
-            # 10% chance to flip the sign
-            if random.random() < 0.1:
-                sign *= -1  # Flip the sign
-                
-            # Add the Dirac to the signal
-            signal[index] += sign * amplitude * np.exp(-i * dt_factor * dt / tau)
-    
-    # Amplitude and radiation (random sign) of the P wave
-    amplitude_P = random.uniform(0.5, 1.0)  # Amplitude between 0.5 and 1
-    sign_P = random.choice([-1, 1])  # Random sign for P to simulate radiation pattern at source
-    signal[0] = sign_P * amplitude_P  # Simulate P-wave dirac
-    add_coda_diracs(signal, 0, amplitude_P, sign_P)  # Add tail to simulate exponential energy decrease
-    
-    # Position of first Dirac before tail
-    pP_index = int(delta_pP / dt)
-    sP_index = int(delta_sP / dt)
-    
-    # pP
-    if pP_index < len(signal):
-        amplitude_pP = amplitude_P * random.uniform(0, 1.1)  # Amplitude between 0% and 110% of P
-        sign_pP = random.choice([-1, 1])  # Random sign for pP to simulate radiation pattern at source
-        signal[pP_index] = sign_pP * amplitude_pP
-        add_coda_diracs(signal, pP_index, amplitude_pP, sign_pP) # Add tail to simulate exponential energy decrease
-    
-    # sP
-    if sP_index < len(signal):
-        amplitude_sP = amplitude_P * random.uniform(0, 1.1)  # Amplitude between 0% and 110% of P
-        sign_sP = random.choice([-1, 1])  # Random sign for sP to simulate radiation pattern at source
-        signal[sP_index] = sign_sP * amplitude_sP
-        add_coda_diracs(signal, sP_index, amplitude_sP, sign_sP) # Add tail to simulate exponential energy decrease
+    signals, time = generate_diracs_stack([(delta_pP, delta_sP)], source, [station], dt=dt, duration=duration, tau=tau, generator=generator)
+    signal = signals[0]
 
     if plot is True:
+        import matplotlib.pyplot as plt  # Deferred import, only needed for plotting
         plt.figure(figsize=(12,5))
         plt.stem(time, signal, basefmt=" ", label="Raw Signal")
         plt.title("Raw Signal")
@@ -96,7 +97,64 @@ def generate_diracs(delta_pP, delta_sP, source, station, dt=0.01, duration=60, t
     return signal, time
 
 
+# Generate the Diracs signals of several stations at once
+def generate_diracs_stack(deltas, source, stations, dt=0.01, duration=60, tau=3.0, generator=None):
+    """
+    Generates the signals with Diracs (see generate_diracs) of multiple stations, filled together
+    into a stack of shape (stations, samples) instead of one station at a time.
+    
+    Parameters:
+    - deltas: list of (delta_pP, delta_sP) delays in seconds, one per station
+    - source: source coordinates (lat, long, depth)
+    - stations: list of station coordinates (lat, long)
+    - dt: sampling step (in seconds); 100 Hz
+    - duration: total signal duration (in seconds)
+    - tau: time constant for exponential decay (in seconds)
+    - generator: np.random.Generator to draw from (default is the module generator rng)
+    
+    Returns:
+    - signals: array of shape (stations, samples) containing the signals
+    - time: array containing the corresponding time instances (read-only, shared for the default duration and dt)
+    """
+    generator = rng if generator is None else generator
+    num_stations = len(stations)
+    
+    # Compute coda duration from distance between stations and epicenter
+    P_velocity = 7.5e3 # average P-waves velocity in the crust and upper mantle
+    stations_lat, stations_lon = np.reshape(stations, (num_stations, 2)).T
+    dist_epi = data_generation.arrival_time.direct_distances(source[0], source[1], source[2], stations_lat, stations_lon, 0)
+    coda_duration = (dist_epi / P_velocity).astype(int)
+    
+    # Discrete time
+    if duration == 60 and dt == 0.01:
+        time = default_time
+    else:
+        time = np.arange(0, duration, dt)
+    signals = np.zeros((num_stations, time.shape[0]), dtype=np.float32)  # Single precision is enough for normalized envelopes
+    
+    # Position of first Dirac before tail, for P, pP and sP (columns)
+    indices = np.zeros((num_stations, 3), dtype=int)
+    indices[:, 1:] = (np.reshape(deltas, (num_stations, 2)) / dt).astype(int)
+    
+    # Amplitudes: P between 0.5 and 1, pP and sP between 0% and 110% of P
+    amplitudes = generator.uniform(0.5, 1.0, size=(num_stations, 1)) * np.ones(3)
+    amplitudes[:, 1:] *= generator.uniform(0, 1.1, size=(num_stations, 2))
+    
+    # Random signs to simulate radiation pattern at source
+    signs = generator.choice((-1, 1), size=(num_stations, 3))
+    
+    # P, then pP and sP, each Dirac followed by its tail to simulate exponential energy decrease
+    rows = np.arange(num_stations)
+    for phase in range(3):
+        valid = indices[:, phase] < signals.shape[1]  # Skip arrivals after the end of the signal
+        signals[rows[valid], indices[valid, phase]] = signs[valid, phase] * amplitudes[valid, phase]
+        add_coda_diracs(signals, indices[:, phase], amplitudes[:, phase], signs[:, phase], coda_duration, dt=dt, tau=tau, generator=generator)
+    
+    return signals, time
+
+
 # Convolution of the signal with a wavelet
+@functools.lru_cache(maxsize=8)
 def generate_ricker_wavelet(f_c=1.65, dt=0.01, length=1.0):
     """
     Generates a Ricker wavelet.
@@ -107,12 +165,17 @@ def generate_ricker_wavelet(f_c=1.65, dt=0.01, length=1.0):
     - length: total duration of the wavelet (s)
     
     Returns:
-    - w: array containing the wavelet
-    - t: array of corresponding times
+    - w: array containing the wavelet, in single precision (read-only, cached per parameters)
+    - t: array of corresponding times (read-only, cached per parameters)
     """
     t = np.arange(-length / 2, length / 2, dt)
     w = (1 - 2 * (np.pi * f_c * t)**2) * np.exp(-(np.pi * f_c * t)**2)
     w /= np.sum(np.abs(w)) # Normalize the wavelet to avoid amplification
+    w = w.astype(np.float32) # Same precision as the signals
+    
+    # Shared between calls, so protect against in-place modifications
+    w.setflags(write=False)
+    t.setflags(write=False)
     
     return w, t
 
@@ -122,19 +185,19 @@ def convolve_signal_with_wavelet(signal, time, plot=False):
     Convolves a discrete signal with a wavelet.
     
     Parameters:
-    - signal: input signal
-    - wavelet: wavelet for convolution
+    - signal: input signal, or stack of signals of shape (stations, samples)
+    - time: array containing the corresponding time instances (used for plotting)
     
     Returns:
-    - signal_convolved: convolved signal
+    - signal_convolved: convolved signal, same shape as signal and centered on it
     """
+    signal = np.asarray(signal)
     wavelet, wavelet_time = generate_ricker_wavelet()
-    signal_convolved_full = np.convolve(signal, wavelet, mode="full") # Using mode "full" to minimize artifacts
-    valid_length = len(signal)
-    start_index = (len(signal_convolved_full) - valid_length) // 2
-    signal_convolved = signal_convolved_full[start_index:start_index + valid_length]
+    wavelet_nd = wavelet.reshape((1,) * (signal.ndim - 1) + wavelet.shape) # Broadcast over stacked signals
+    signal_convolved = oaconvolve(signal, wavelet_nd, mode="same", axes=-1) # Overlap-add, centered on the input signal
     
     if plot is True:
+        import matplotlib.pyplot as plt  # Deferred import, only needed for plotting
         plt.figure(figsize=(12, 6))
         
         # Wavelet
@@ -162,70 +225,122 @@ def convolve_signal_with_wavelet(signal, time, plot=False):
 
 
 # Add gaussian white noise 
-def add_white_noise(signal, snr_db=random.uniform(2, 5)):
+def add_white_noise(signal, snr_db=None, out=None, generator=None):
     """
     Adds Gaussian white noise to a signal based on the specified signal-to-noise ratio (SNR).
     
     Parameters:
-    - signal : array containing the original signal
-    - snr_db : signal-to-noise ratio in decibels (dB)
+    - signal : array containing the original signal, or stack of signals of shape (stations, samples)
+    - snr_db : signal-to-noise ratio in decibels (dB), scalar or one per signal (default is drawn between 2 and 5 dB for each signal)
+    - out : array where to store the noisy signal, can be signal itself (default is a new array)
+    - generator : np.random.Generator to draw from (default is the module generator rng)
     
     Returns:
     - noisy_signal : the signal with added noise
+    - snr_db : signal-to-noise ratio used (one per signal if drawn)
     """
-    # Signal power
-    signal_power = np.mean(signal**2)
+    generator = rng if generator is None else generator
+    signal = np.asarray(signal)
+    dtype = np.result_type(signal.dtype, np.float32)  # Keep single precision signals in single precision, others go to double
+    
+    # Draw a new SNR for each signal at each call
+    if snr_db is None:
+        snr_db = generator.uniform(2, 5, size=signal.shape[:-1] if signal.ndim > 1 else None)  # Scalar for a single signal
+    
+    # Signal power (per signal)
+    signal_power = np.mean(np.square(signal, dtype=dtype), axis=-1, keepdims=True)
     # Noise power to achieve the desired SNR
-    snr_linear = 10**(snr_db / 10)
+    snr_linear = np.expand_dims(10**(np.asarray(snr_db) / 10), -1)
     noise_power = signal_power / snr_linear
     # Generate the noise
-    noise = np.random.normal(0, np.sqrt(noise_power), size=signal.shape)
+    noise = generator.standard_normal(signal.shape, dtype=dtype)
+    noise *= np.sqrt(noise_power)
     # Add noise to the signal
-    noisy_signal = signal + noise
+    noisy_signal = np.add(signal, noise, out=out)
     
     return noisy_signal, snr_db
 
 
 # Bandpass filter
-def bandpass_filter(signal, lowcut=0.8, highcut=2.5, fs=100, order=3):
+@functools.lru_cache(maxsize=32)
+def design_bandpass_filter(lowcut=0.8, highcut=2.5, fs=100, order=3):
     """
-    Applies a Butterworth bandpass filter.
+    Designs a Butterworth bandpass filter.
     
     Parameters:
-    - signal : array containing the signal
     - lowcut : lower cutoff frequency (Hz)
     - highcut : upper cutoff frequency (Hz)
     - fs : sampling frequency (Hz)
-    - order : filter order (default is 4)
+    - order : filter order
     
     Returns:
-    - filtered_signal : filtered signal
+    - sos : second-order sections of the filter (cached per parameters, must not be modified)
     """
     nyquist = 0.5 * fs
     low = lowcut / nyquist
     high = highcut / nyquist
-    b, a = butter(order, [low, high], btype='band')  # Filter coefficients
-    filtered_signal = filtfilt(b, a, signal)  # Apply the filter
+    sos = butter(order, [low, high], btype='band', output='sos')  # Filter coefficients as second-order sections
+    
+    return sos
+
 
-    # Z-score normalization
-    filtered_signal_normalized = (filtered_signal - np.mean(filtered_signal)) / np.std(filtered_signal)
+def bandpass_filter(signal, lowcut=0.8, highcut=2.5, fs=100, order=3):
+    """
+    Applies a Butterworth bandpass filter.
     
-    return filtered_signal_normalized
+    Parameters:
+    - signal : array containing the signal, or stack of signals of shape (stations, samples)
+    - lowcut : lower cutoff frequency (Hz)
+    - highcut : upper cutoff frequency (Hz)
+    - fs : sampling frequency (Hz)
+    - order : filter order (default is 4)
+    
+    Returns:
+    - filtered_signal : filtered signal
+    """
+    signal = np.asarray(signal)
+    sos = design_bandpass_filter(lowcut, highcut, fs, order)  # Filter coefficients
+    sos = sos.astype(np.result_type(signal.dtype, np.float32), copy=False)  # Keep single precision signals in single precision, integers go to double
+    filtered_signal = sosfiltfilt(sos, signal, axis=-1)  # Apply the filter
+
+    # Z-score normalization (per signal), in place to avoid temporaries
+    filtered_signal -= np.mean(filtered_signal, axis=-1, keepdims=True)
+    filtered_signal /= np.std(filtered_signal, axis=-1, keepdims=True)
+    
+    return filtered_signal
 
 # Hilbert envelope extraction
 def extract_hilbert_envelope(signal):
     """
     Extracts the analytic envelope of a signal using the Hilbert transform.
+    The Hilbert transform is computed with real FFTs, the envelope being sqrt(signal**2 + hilbert(signal)**2).
+    The signal is zero-padded to next_fast_len before the FFT and trimmed back. For lengths that are already
+    FFT-friendly (e.g. the default 6000 samples) this is the same as scipy.signal.hilbert, otherwise it matches
+    hilbert(signal, N=next_fast_len(...)) and differs from the unpadded transform, mostly near the edges
+    (up to ~0.1 on the normalized envelope for 6001 samples, ~0.01 in the interior).
     
     Parameters:
-    - signal : array containing the signal
+    - signal : array containing the signal, or stack of signals of shape (stations, samples)
     
     Returns:
     - envelope : analytic envelope of the signal
     """
-    analytic_signal = hilbert(signal)  # Analytic signal
-    envelope = np.abs(analytic_signal)  # Envelope (magnitude of the analytic signal)
-    envelope /= np.max(envelope)  # Normalize to 1
+    signal = np.asarray(signal)
+    
+    # Zero-pad to an FFT-friendly length so duration/dt changes never hit a slow (e.g. prime) size
+    num_samples = signal.shape[-1]
+    num_fft = next_fast_len(num_samples, real=True)
+    
+    # Hilbert transform: -j on positive frequencies, DC (and Nyquist for even lengths) cancelled
+    spectrum = rfft(signal, n=num_fft, axis=-1)
+    spectrum *= -1j
+    spectrum[..., 0] = 0
+    if num_fft % 2 == 0:
+        spectrum[..., -1] = 0
+    hilbert_transform = irfft(spectrum, n=num_fft, axis=-1)[..., :num_samples]
+    
+    envelope = np.hypot(signal, hilbert_transform, out=hilbert_transform)  # Envelope (magnitude of the analytic signal), reusing the transform buffer
+    envelope /= np.max(envelope, axis=-1, keepdims=True)  # Normalize to 1 (per signal), in place
     
     return envelope
 
@@ -252,10 +367,12 @@ def generate_one_signal(plot=False, depth=None, use_TauP=True):
     # Get Hilbert enveloppe
     envelope = extract_hilbert_envelope(filtered_signal)
 
-    # Decimate the envelope to 20 Hz
-    envelope = decimate(envelope, q=5, zero_phase=True)
+    # Decimate the envelope to 20 Hz (already band-limited well below 10 Hz by the bandpass, no anti-alias filter needed)
+    envelope = envelope[::5].copy()
 
     if plot is True:
+        import matplotlib.pyplot as plt  # Deferred import, only needed for plotting
+        import seaborn as sns  # Deferred import, only needed for plotting
         sns.set_style("whitegrid")  # Set style
         sns.set_palette("deep")  # Use a Seaborn color palette
         
@@ -328,24 +445,24 @@ def reorganise_distance(deltas, source, stations):
     Returns:
         tuple: Reorganized stations and deltas sorted by distance from the source.
     """
-    reorg_data = [
-        (data_generation.arrival_time.direct_distance(source[0], source[1], 0, station[0], station[1], 0), station, delta)
-        for station, delta in zip(stations, deltas)
-    ]
+    # Distances of all stations at once
+    stations_lat, stations_lon = np.reshape(stations, (len(stations), 2)).T
+    distances = data_generation.arrival_time.direct_distances(source[0], source[1], 0, stations_lat, stations_lon, 0)
+    
     # Sort by distance
-    reorg_data.sort(key=lambda x: x[0])
+    order = np.argsort(distances, kind='stable')
 
     # Extract sorted stations, distances and deltas
-    sorted_stations = [item[1] for item in reorg_data]
-    sorted_distances = [item[0] for item in reorg_data]
-    sorted_deltas = [item[2] for item in reorg_data]
+    sorted_stations = [stations[i] for i in order]
+    sorted_distances = distances[order].tolist()
+    sorted_deltas = [deltas[i] for i in order]
 
     return sorted_deltas, sorted_stations, sorted_distances
 
     
     
 # Generate signal from delta_pP and delta_sP for multiple stations
-def generate_signals(num_stations=50, depth=None, rand_inactive=0, use_TauP=True):
+def generate_signals(num_stations=50, depth=None, rand_inactive=0, use_TauP=True, workers=-1, generator=None):
     """
     Generate signals for multiple stations given a single source.
     
@@ -354,48 +471,51 @@ def generate_signals(num_stations=50, depth=None, rand_inactive=0, use_TauP=True
     - depth : depth to simulate (default is None)
     - rand_inactive : max number of inactive stations
     - use_TauP : whether to use or not TauP model for propagation
+    - workers : number of threads for the FFTs (default is -1, all cores)
+    - generator : np.random.Generator for all random draws (default is None, random module for coordinates and module generator rng for signals)
     
     Returns:
     - results : list of tuples (envelope, source, station) for each station
     """
     # Generate arrival times for multiple stations
-    deltas, source, stations = data_generation.arrival_time.generate_arrival_samples(num_stations=num_stations, depth=depth, use_TauP=use_TauP)
+    deltas, source, stations = data_generation.arrival_time.generate_arrival_samples(num_stations=num_stations, depth=depth, use_TauP=use_TauP, generator=generator)
 
     # Reorganize deltas and stations from distance to source
     deltas, stations, distances = reorganise_distance(deltas, source, stations)
 
     # Randomly determine the number of active stations (from 20 to num_stations)
-    active_stations = num_stations - random.randint(0, rand_inactive)
+    signal_generator = rng if generator is None else generator
+    active_stations = max(num_stations - signal_generator.integers(0, rand_inactive, endpoint=True), 0)  # Never more inactive stations than stations
 
     # Generate signals
     results = []
     
-    for i, (delta_pP, delta_sP) in enumerate(deltas):
-        if i < active_stations:
-            # Generate diracs
-            diracs, time = generate_diracs(delta_pP, delta_sP, source, stations[i])
-            
-            # Generate signal
-            signal = convolve_signal_with_wavelet(diracs, time)
+    if active_stations > 0:
+        # Generate diracs for active stations, stacked as (active_stations, samples) so each step processes all stations at once
+        diracs, time = generate_diracs_stack(deltas[:active_stations], source, stations[:active_stations], generator=generator)
+        
+        # Thread the FFTs (convolution, Hilbert) over the available cores
+        with set_workers(workers):
+            # Generate signals
+            signals = convolve_signal_with_wavelet(diracs, time)
             
             # Add noise
-            noisy_signal, snr_db = add_white_noise(signal)
+            noisy_signals, snr_db = add_white_noise(signals, out=signals, generator=generator)  # Clean signals are not needed anymore
             
-            # Filter signal
-            filtered_signal = bandpass_filter(noisy_signal)
+            # Filter signals
+            filtered_signals = bandpass_filter(noisy_signals)
             
-            # Get Hilbert envelope
-            envelope = extract_hilbert_envelope(filtered_signal)
+            # Get Hilbert envelopes
+            envelopes = extract_hilbert_envelope(filtered_signals)
+        
+        # Decimate the envelopes to 20 Hz (already band-limited well below 10 Hz by the bandpass, no anti-alias filter needed)
+        envelopes = envelopes[:, ::5].copy()
+        
+        # Append results for active stations
+        results.extend((envelope, source, stations[i]) for i, envelope in enumerate(envelopes))
     
-            # Decimate the envelope to 20 Hz
-            envelope = decimate(envelope, q=5, zero_phase=True)
-            
-            # Append results for this station
-            results.append((envelope, source, stations[i]))
-
-        else:
-            # Add zero signals for inactive stations, with no data on source and station
-            results.append((np.zeros(1200), [0,0,0], [0,0]))  # 1200 points for 60s at 20 Hz
+    # Add zero signals for inactive stations, with no data on source and station
+    results.extend((np.zeros(1200, dtype=np.float32), [0,0,0], [0,0]) for _ in range(active_stations, num_stations))  # 1200 points for 60s at 20 Hz
     
     return results, distances
 